@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Cinematic slide video generator (per-slide TTS) that uses Pillow for text rendering.
+Cinematic slide video generator (per-slide TTS) that uses Pillow for text rendering
+and a single ffmpeg filter graph for the final render.
 Compatible with Pillow 10+ and GitHub Actions.
 
 Outputs: generated_videos/<title>_<timestamp>.mp4
@@ -8,27 +9,34 @@ Outputs: generated_videos/<title>_<timestamp>.mp4
 
 import os
 import sys
+import math
+import hashlib
+import functools
 import random
 import requests
 import asyncio
-import time
-import textwrap
+import subprocess
+import tempfile
+import shutil
 import traceback
 from datetime import datetime
-from io import BytesIO
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 # Third-party imports
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips, CompositeVideoClip, concatenate_audioclips
-# Note: For simple silence generation if TTS fails
-from moviepy.audio.AudioClip import AudioClip
 from deep_translator import GoogleTranslator
 import edge_tts
 import yfinance as yf
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 
 # ---------- CONFIG ----------
 OUTPUT_FOLDER = "generated_videos"
+CACHE_FOLDER = "cache"
+VIDEO_CACHE_KEEP = 5  # rendered videos kept in the cache, least recently used dropped first
 VIDEO_MODE = "PORTRAIT"  # PORTRAIT or LANDSCAPE
 
 if VIDEO_MODE == "PORTRAIT":
@@ -37,8 +45,11 @@ else:
     RESOLUTION = (1920, 1080)
 
 VOICE = "te-IN-ShrutiNeural"
+TTS_CONCURRENCY = 8  # parallel edge-tts sockets; more tends to get throttled
 MIN_SLIDE_CHARS = 40
 MAX_SLIDE_CHARS = 1200
+MAX_SLIDES = 14
+TRANSLATE_MAX_CHARS = 4500  # Google Translate rejects requests over 5000 chars
 APP_LOGO_PATH = "assets/logo.png"
 
 # UPDATED: Includes local fonts folder for CI/CD compatibility
@@ -57,13 +68,31 @@ FALLBACK_IMAGES = [
 
 WATCHLIST = ["RELIANCE.NS","TCS.NS","HDFCBANK.NS","INFY.NS","ICICIBANK.NS","HINDUNILVR.NS","SBIN.NS","BHARTIARTL.NS","ITC.NS","KOTAKBANK.NS","LICI.NS","LT.NS","AXISBANK.NS","ASIANPAINT.NS","MARUTI.NS"]
 
+# Rendering is done by a single ffmpeg process (installed by the workflow)
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+VIDEO_FPS = 24
+AUDIO_FPS = 44100  # slide audio is kept in memory as float32 stereo samples
+# Docker limits /dev/shm to 64MB by default, less than a long video's slide bitmaps
+TEMP_MIN_FREE_BYTES = 512 * 1024 * 1024
+
 # Cinematic params
 FADE_DURATION = 1.2
 PADDING_PER_SLIDE = 0.35
 ZOOM_FACTOR = 0.06
+# Slides are drawn at this size and panned inside a RESOLUTION window
+ZOOMED_RESOLUTION = (round(RESOLUTION[0] * (1 + ZOOM_FACTOR)), round(RESOLUTION[1] * (1 + ZOOM_FACTOR)))
 
 # ---------------- utilities ----------------
+# Shared HTTP session: keeps connections alive across article/background fetches
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_ADAPTER = HTTPAdapter(pool_maxsize=10, max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)))
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+@functools.lru_cache(maxsize=16)
 def load_font(size):
+    # One FreeTypeFont per size for the whole run (title, body and footer reuse them)
     for p in FONT_PATHS:
         if os.path.exists(p):
             try:
@@ -72,35 +101,46 @@ def load_font(size):
                 continue
     return ImageFont.load_default()
 
-def _retry_request(func, retries=3, backoff=1.5):
-    last = None
-    for i in range(retries):
-        try:
-            return func()
-        except Exception as e:
-            last = e
-            time.sleep(backoff * (2 ** i))
-    raise last
+def temp_root():
+    # RAM-backed /dev/shm when it has room for the slide bitmaps, else the normal temp dir
+    try:
+        st = os.statvfs("/dev/shm")
+        if st.f_bavail * st.f_frsize >= TEMP_MIN_FREE_BYTES:
+            return "/dev/shm"
+    except (AttributeError, OSError):
+        pass
+    return tempfile.gettempdir()
 
 # ---------------- get data ----------------
+def _ticker_news(ticker):
+    stock = yf.Ticker(ticker)
+    return stock, getattr(stock, "news", None) or []
+
 def get_trending_stock():
     random.shuffle(WATCHLIST)
-    for ticker in WATCHLIST[:15]:
-        try:
-            stock = yf.Ticker(ticker)
-            news = getattr(stock, "news", None) or []
-            if news:
-                latest = news[0]
-                title = latest.get('title','Market Update')
-                link = latest.get('link') or latest.get('url')
-                info = getattr(stock, "info", {}) or {}
-                name = info.get('shortName', ticker)
-                price = info.get('currentPrice',0)
-                script = f"Breaking update on {name}. Current price {price} rupees. {title}."
-                return {"type":"news","title":f"News_{ticker}","name":name,"script":script,"article_link":link}
-        except Exception:
-            continue
-    return None
+    # Each .news lookup is a Yahoo round-trip, so query the tickers side by side
+    pool = ThreadPoolExecutor(max_workers=8)
+    try:
+        futures = {pool.submit(_ticker_news, ticker): ticker for ticker in WATCHLIST[:15]}
+        for fut in as_completed(futures):
+            ticker = futures[fut]
+            try:
+                stock, news = fut.result()
+                if news:
+                    latest = news[0]
+                    title = latest.get('title','Market Update')
+                    link = latest.get('link') or latest.get('url')
+                    info = getattr(stock, "info", {}) or {}
+                    name = info.get('shortName', ticker)
+                    price = info.get('currentPrice',0)
+                    script = f"Breaking update on {name}. Current price {price} rupees. {title}."
+                    return {"type":"news","title":f"News_{ticker}","name":name,"script":script,"article_link":link}
+            except Exception:
+                continue
+        return None
+    finally:
+        # Don't wait for the slower tickers once one has news
+        pool.shutdown(wait=False, cancel_futures=True)
 
 def get_market_analysis_data():
     indices=[{"ticker":"^NSEI","name":"Nifty 50"},{"ticker":"^NSEBANK","name":"Bank Nifty"}]
@@ -122,37 +162,36 @@ def fetch_article_text(url):
     if not url:
         return None
     try:
-        headers = {"User-Agent":"Mozilla/5.0"}
-        resp = requests.get(url, headers=headers, timeout=20)
+        resp = _SESSION.get(url, timeout=20)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        # lxml.html does the parse and the XPath selection in C. It never sees the response
+        # headers, so pass on a charset declared there; otherwise it goes by <meta charset>
+        parser = None
+        if "charset=" in resp.headers.get("Content-Type", "").lower():
+            parser = lxml_html.HTMLParser(encoding=resp.encoding)
+        tree = lxml_html.fromstring(resp.content, parser=parser)
         paras=[]
-        article = soup.find("article")
-        if article:
-            for p in article.find_all("p"):
-                t=p.get_text(strip=True)
-                if t: paras.append(t)
-        if not paras:
-            candidates = soup.find_all(["div","section"])
-            best=None; best_count=0
-            for c in candidates:
-                ps = c.find_all("p")
-                if len(ps) > best_count:
-                    best_count = len(ps); best = c
-            if best and best_count>0:
-                for p in best.find_all("p"):
-                    t=p.get_text(strip=True)
+        for p in tree.xpath("(//article)[1]//p"):
+            t=p.text_content().strip()
+            if t: paras.append(t)
+        all_ps = tree.xpath("//p") if not paras else []
+        if not paras and all_ps:
+            # Count <p> tags per container in one pass and keep the busiest one
+            parent_counts = Counter(p.getparent() for p in all_ps)
+            best_parent = parent_counts.most_common(1)[0][0]
+            for p in all_ps:
+                if p.getparent() is best_parent:
+                    t=p.text_content().strip()
                     if t: paras.append(t)
         if not paras:
             # Fallback to meta description
-            meta = soup.find("meta", property="og:description") or soup.find("meta", attrs={"name":"description"})
-            if meta and meta.get("content"):
-                paras = [meta.get("content").strip()]
+            meta = tree.xpath('//meta[@property="og:description"]/@content') or tree.xpath('//meta[@name="description"]/@content')
+            if meta and meta[0].strip():
+                paras = [meta[0].strip()]
         if not paras:
             # Last resort
-            ps = soup.find_all("p")
-            for p in ps[:10]:
-                t=p.get_text(strip=True)
+            for p in all_ps[:10]:
+                t=p.text_content().strip()
                 if t: paras.append(t)
         if not paras:
             return None
@@ -164,23 +203,37 @@ def fetch_article_text(url):
         return None
 
 # ---------------- split into slides ----------------
-def split_text_into_slides(text, title=None, approx_chars=700):
-    if not text:
-        return []
-    paras = [p.strip() for p in text.split("\n\n") if p.strip()]
-    slides=[]
-    if title:
-        slides.append({"title":title,"body":""})
-    cur=[]; cur_len=0
+def _pack_paragraphs(paras, approx_chars):
+    bodies=[]; cur=[]; cur_len=0
     for p in paras:
         pl = len(p)
         if cur_len + pl + 2 <= approx_chars:
             cur.append(p); cur_len+=pl+2
         else:
-            slides.append({"title":None,"body":"\n\n".join(cur)})
+            if cur:
+                bodies.append("\n\n".join(cur))
             cur=[p]; cur_len=pl+2
     if cur:
-        slides.append({"title":None,"body":"\n\n".join(cur)})
+        bodies.append("\n\n".join(cur))
+    return bodies
+
+def split_text_into_slides(text, title=None, approx_chars=700):
+    if not text:
+        return []
+    paras = [p.strip() for p in text.split("\n\n") if p.strip()]
+    # Size the slides up front from the text length, then pack in a single greedy pass
+    slots = max(1, MAX_SLIDES - bool(title))
+    approx_chars = max(approx_chars, math.ceil(len(text) / slots))
+    bodies = _pack_paragraphs(paras, approx_chars)
+    # Greedy packing can still overshoot on uneven paragraphs; merge the shortest
+    # neighbouring pair until the slides fit
+    while len(bodies) > slots:
+        i = min(range(len(bodies) - 1), key=lambda j: len(bodies[j]) + len(bodies[j + 1]))
+        bodies[i:i + 2] = [bodies[i] + "\n\n" + bodies[i + 1]]
+    slides=[]
+    if title:
+        slides.append({"title":title,"body":""})
+    slides += [{"title":None,"body":b} for b in bodies]
 
     # merge/skip short slides
     cleaned=[]
@@ -195,67 +248,168 @@ def split_text_into_slides(text, title=None, approx_chars=700):
                 cleaned.append(s)
         else:
             cleaned.append(s)
-    
-    # Recursion if too many slides
-    if len(cleaned) > 14:
-        return split_text_into_slides(text, title=title, approx_chars=1200)
     return cleaned
 
+# ---------------- translation ----------------
+def translate_texts(texts):
+    translator = GoogleTranslator(source='auto', target='te')
+    # TTS ignores paragraph breaks, so one text per line lets a single request carry many slides
+    all_lines = [" ".join(t.split()) for t in texts]
+    # Identical texts (repeated boilerplate paragraphs, retries) are only sent once
+    lines = list(dict.fromkeys(all_lines))
+    batches=[]; cur=[]; cur_len=0
+    for i, line in enumerate(lines):
+        if cur and cur_len + len(line) + 1 > TRANSLATE_MAX_CHARS:
+            batches.append(cur); cur=[]; cur_len=0
+        cur.append(i); cur_len += len(line) + 1
+    if cur:
+        batches.append(cur)
+
+    out = [None] * len(lines)
+    for batch in batches:
+        try:
+            translated = translator.translate("\n".join(lines[i] for i in batch)).split("\n")
+        except Exception as e:
+            print(f"[WARN] Batch translation failed. Error: {e}")
+            translated = []
+        if len(translated) == len(batch):
+            for i, t in zip(batch, translated):
+                out[i] = t.strip()
+            continue
+        # Line structure was not preserved; translate this batch one text at a time
+        for i in batch:
+            try:
+                out[i] = translator.translate(lines[i])
+            except Exception as e:
+                print(f"[WARN] Translation failed for slide. Error: {e}")
+    by_line = dict(zip(lines, out))
+    return [by_line[line] for line in all_lines]
+
 # ---------------- per-slide TTS ----------------
-async def synthesize_slide_tts(text, out_path):
+async def decode_mp3(data):
+    # One short-lived ffmpeg decode per slide; the samples are then mixed in memory
+    proc = await asyncio.create_subprocess_exec(
+        FFMPEG_BINARY, "-v", "error", "-i", "pipe:0", "-f", "f32le", "-ac", "2", "-ar", str(AUDIO_FPS), "pipe:1",
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    out, err = await proc.communicate(data)
+    if proc.returncode != 0:
+        raise RuntimeError(err.decode(errors="ignore").strip())
+    return np.frombuffer(out, dtype=np.float32).reshape(-1, 2)
+
+async def synthesize_slide_tts(telugu_text):
+    # Returns (samples, ok); ok is False when the slide fell back to silence
     try:
-        # Translate to Telugu
-        telugu = GoogleTranslator(source='auto', target='te').translate(text)
-        comm = edge_tts.Communicate(telugu, VOICE)
-        await comm.save(out_path)
-        return True
+        if not telugu_text:
+            raise ValueError("no translated text")
+        comm = edge_tts.Communicate(telugu_text, VOICE)
+        mp3 = bytearray()
+        async for chunk in comm.stream():
+            if chunk["type"] == "audio":
+                mp3.extend(chunk["data"])
+        samples = await decode_mp3(bytes(mp3))
+        if not len(samples):
+            raise ValueError("no audio decoded")
+        return samples, True
     except Exception as e:
         print(f"[WARN] TTS failed for slide. Error: {e}")
-        # fallback: create a short silent mp3
-        silence = AudioClip(lambda t: 0*t, duration=3.0).set_fps(44100)
-        silence.write_audiofile(out_path, fps=44100, codec="mp3", verbose=False, logger=None)
-        return False
+        # fallback: a short silence
+        return np.zeros((int(3.0 * AUDIO_FPS), 2), dtype=np.float32), False
 
 # ---------------- background & visual fx ----------------
+def _fetch_source_photo(url, cached_src):
+    # Streamed: the headers are checked before the body is read, which goes straight to disk
+    with _SESSION.get(url, timeout=15, stream=True) as r:
+        if r.status_code != 200 or not r.headers.get("Content-Type","").startswith("image/"):
+            return False
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        with open(cached_src + ".tmp","wb") as f:
+            for chunk in r.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+    os.replace(cached_src + ".tmp", cached_src)
+    return True
+
 def download_background(path):
-    for url in FALLBACK_IMAGES:
-        try:
-            r = requests.get(url, timeout=15)
-            if r.status_code == 200 and r.headers.get("Content-Type","").startswith("image/"):
-                with open(path,"wb") as f: f.write(r.content)
-                return True
-        except Exception:
-            continue
-    # create solid fallback
+    # The source photos are static, so each download is kept in the cache keyed by its URL
+    sources = [(url, os.path.join(CACHE_FOLDER, f"src_{hashlib.sha1(url.encode()).hexdigest()}.jpg"))
+               for url in FALLBACK_IMAGES]
+    for _, cached_src in sources:
+        if os.path.exists(cached_src):
+            shutil.copyfile(cached_src, path)
+            return True
+    # Nothing cached yet: request every candidate at once and keep whichever arrives first
+    pool = ThreadPoolExecutor(max_workers=len(sources))
+    try:
+        futures = {pool.submit(_fetch_source_photo, url, cached_src): cached_src for url, cached_src in sources}
+        for fut in as_completed(futures):
+            try:
+                if fut.result():
+                    shutil.copyfile(futures[fut], path)
+                    return True
+            except Exception:
+                continue
+    finally:
+        # The slower downloads finish in the background and still land in the cache
+        pool.shutdown(wait=False)
+    # create solid fallback (not worth caching, so report it)
     img = Image.new("RGB", RESOLUTION, (18,18,18))
     img.save(path, quality=90)
-    return True
+    return False
+
+@functools.lru_cache(maxsize=1)
+def code_hash():
+    # The cache is restored across commits, so rendered entries must change with the code
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def background_cache_path(logo_path=None):
+    # The composited background only depends on these inputs, so reuse it across runs
+    # Logo bytes, not mtime: actions/checkout stamps every file with the checkout time
+    logo_hash = None
+    if logo_path:
+        with open(logo_path, "rb") as f:
+            logo_hash = hashlib.sha1(f.read()).hexdigest()
+    key = hashlib.sha1(repr((RESOLUTION, FALLBACK_IMAGES, logo_hash, code_hash())).encode()).hexdigest()
+    return os.path.join(CACHE_FOLDER, f"bg_{key}.jpg")
+
+def video_cache_path_for(slides, bg_path):
+    # Everything that ends up in the rendered video
+    key = hashlib.sha1(repr((slides, os.path.basename(bg_path), VOICE, RESOLUTION, VIDEO_FPS,
+                             FADE_DURATION, PADDING_PER_SLIDE, ZOOM_FACTOR, code_hash())).encode()).hexdigest()
+    return os.path.join(CACHE_FOLDER, f"video_{key}.mp4")
+
+def prune_video_cache(keep=VIDEO_CACHE_KEEP):
+    # LRU by mtime: hits touch their entry, so the oldest ones are the least recently used
+    try:
+        entries = [e for e in os.scandir(CACHE_FOLDER) if e.name.startswith("video_") and e.name.endswith(".mp4")]
+    except OSError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for e in entries[keep:]:
+        try:
+            os.remove(e.path)
+        except OSError:
+            pass
 
 def add_dark_gradient_and_logo(input_image_path, out_path, logo_path=None):
     bg = Image.open(input_image_path).convert("RGBA")
     w,h = bg.size
 
     # Vertical gradient (top lighter, bottom darker)
-    gradient = Image.new("L", (1,h))
-    for y in range(h):
-        a = int( (0.2 + 0.5 * (y / h)) * 255 )
-        gradient.putpixel((0,y), a)
-    alpha = gradient.resize((w,h))
+    grad = np.linspace(0.2, 0.7, h, endpoint=False).reshape(h, 1) * 255
+    alpha = Image.fromarray(np.broadcast_to(grad, (h, w)).astype(np.uint8))
     black = Image.new("RGBA", (w,h), (6,6,8,255))
     black.putalpha(alpha)
 
     composed = Image.alpha_composite(bg, black)
 
-    # Vignette
-    vign = Image.new("L", (w,h))
-    for y in range(h):
-        for x in range(w):
-            dx = (x - w/2)/(w/2)
-            dy = (y - h/2)/(h/2)
-            d = (dx*dx + dy*dy)**0.5
-            v = int( max(0, min(255, (d*1.2)*255)) )
-            vign.putpixel((x,y), v)
-    vign_blur = vign.filter(ImageFilter.GaussianBlur(radius=50))
+    # Vignette: a smooth, low-frequency mask, so build and blur it at quarter
+    # resolution and upsample once
+    qw, qh = max(1, w // 4), max(1, h // 4)
+    ys = np.linspace(-1, 1, qh, endpoint=False)[:, None]
+    xs = np.linspace(-1, 1, qw, endpoint=False)[None, :]
+    d = np.sqrt(xs*xs + ys*ys) * 1.2 * 255
+    vign = Image.fromarray(np.clip(d, 0, 255).astype(np.uint8))
+    vign_blur = vign.filter(ImageFilter.BoxBlur(50 / 4)).resize((w,h), Image.BILINEAR)
     black2 = Image.new("RGBA",(w,h),(0,0,0))
     black2.putalpha(vign_blur)
     final = Image.alpha_composite(composed, black2)
@@ -274,99 +428,201 @@ def add_dark_gradient_and_logo(input_image_path, out_path, logo_path=None):
 
     final.convert("RGB").save(out_path, quality=92)
 
+def prepare_background(bg_path, gradient_path, logo_path=None):
+    # Returns the composited background, from the cache when it has been built before
+    cached_bg_path = os.path.abspath(background_cache_path(logo_path))
+    if os.path.exists(cached_bg_path):
+        return cached_bg_path
+    downloaded = download_background(bg_path)
+    add_dark_gradient_and_logo(bg_path, gradient_path, logo_path=logo_path)
+    if not downloaded:
+        return gradient_path
+    os.makedirs(os.path.dirname(cached_bg_path), exist_ok=True)
+    # The temp dir may be on another filesystem (tmpfs), so copy next to the cache and rename
+    shutil.copyfile(gradient_path, cached_bg_path + ".tmp")
+    os.replace(cached_bg_path + ".tmp", cached_bg_path)
+    return cached_bg_path
+
 # ---------------- render text (UPDATED FOR PILLOW 10+) ----------------
-def render_text_image(title_text, body_text, out_path, title_font_size=86, body_font_size=44):
-    w,h = RESOLUTION
-    canvas = Image.new("RGBA", (w,h), (0,0,0,0))
+def split_long_word(draw, word, font, max_width):
+    # A token wider than the line (URL, ticker run) is broken by character;
+    # every piece keeps at least one character so this always terminates
+    pieces = []
+    piece, piece_w = "", 0
+    for ch in word:
+        w = draw.textlength(piece + ch, font=font)
+        if piece and w > max_width:
+            pieces.append((piece, piece_w))
+            piece, w = ch, draw.textlength(ch, font=font)
+        else:
+            piece += ch
+        piece_w = w
+    if piece:
+        pieces.append((piece, piece_w))
+    return pieces
+
+def wrap_text(draw, text, font, max_width, max_lines=None):
+    # Greedy word wrap on real pixel advances; textlength skips rasterization.
+    # Returns (line, width) pairs so callers can align without measuring again.
+    # Stops measuring once max_lines lines are full.
+    if max_lines is not None and max_lines <= 0:
+        return []
+    space_w = draw.textlength(" ", font=font)
+    lines = []
+    line, line_w = "", 0
+    for token in text.split():
+        token_w = draw.textlength(token, font=font)
+        pieces = [(token, token_w)] if token_w <= max_width else split_long_word(draw, token, font, max_width)
+        for word, word_w in pieces:
+            if line and line_w + space_w + word_w > max_width:
+                lines.append((line, line_w))
+                if max_lines is not None and len(lines) >= max_lines:
+                    return lines
+                line, line_w = word, word_w
+            elif line:
+                line += " " + word
+                line_w += space_w + word_w
+            else:
+                line, line_w = word, word_w
+    if line:
+        lines.append((line, line_w))
+    return lines
+
+def line_height(draw, font):
+    bbox = draw.textbbox((0, 0), "Ag", font=font)
+    return bbox[3] - bbox[1]
+
+def render_text_image(canvas, title_text, body_text, title_font_size=86, body_font_size=44):
+    # Draws straight onto the (background) canvas in place
+    w,h = canvas.size
     draw = ImageDraw.Draw(canvas)
 
     title_font = load_font(title_font_size)
     body_font = load_font(body_font_size)
+    left = int(w * 0.07)
+    right = int(w * 0.07)
+    box_w = w - left - right
 
     # Title
     y_cursor = int(h * 0.12)
     if title_text:
-        wrapped_title = textwrap.fill(title_text, width=30)
-        lines = wrapped_title.splitlines()
-        for line in lines:
-            # FIX: Use textbbox instead of textsize
-            bbox = draw.textbbox((0, 0), line, font=title_font)
-            tw = bbox[2] - bbox[0]
-            th = bbox[3] - bbox[1]
+        th = line_height(draw, title_font)
+        for line, tw in wrap_text(draw, title_text, title_font, box_w):
             draw.text(((w - tw) // 2, y_cursor), line, font=title_font, fill=(255,255,255,255))
             y_cursor += th + 12
         y_cursor += 18
 
     # Body
     if body_text:
-        left = int(w * 0.07)
-        right = int(w * 0.07)
-        box_w = w - left - right
-        approx_chars_per_line = max(30, int(box_w / (body_font_size * 0.45)))
-        wrapped_body = textwrap.fill(body_text, width=approx_chars_per_line)
-        lines = wrapped_body.splitlines()
+        hline = line_height(draw, body_font)
         max_lines = int((h - y_cursor - 150) / (body_font_size + 6))
-        lines = lines[:max_lines]
-        for line in lines:
+        for line, _ in wrap_text(draw, body_text, body_font, box_w, max_lines=max_lines):
             draw.text((left, y_cursor), line, font=body_font, fill=(240,240,240,255))
-            # FIX: Use textbbox instead of textsize
-            bbox = draw.textbbox((0, 0), line, font=body_font)
-            hline = bbox[3] - bbox[1]
             y_cursor += hline + 8
 
-    canvas.convert("RGB").save(out_path, quality=92)
+@functools.lru_cache(maxsize=1)
+def load_background(bg_path):
+    # Decoded once per worker process; callers must draw on a copy
+    return Image.open(bg_path).convert("RGB")
+
+def build_slide_image(title_text, body_text, bg_path, out_path):
+    # Runs in a worker process, so it only takes picklable arguments
+    canvas = load_background(bg_path).copy()
+    render_text_image(canvas, title_text, body_text, title_font_size=86, body_font_size=44)
+    # Scaled once here; ffmpeg only crops the pan window out of it per frame.
+    # BICUBIC: at a 6% upscale it matches LANCZOS to within a shade, at ~2/3 the cost
+    canvas.resize(ZOOMED_RESOLUTION, Image.BICUBIC).save(out_path)
+    return out_path
+
+# ---------------- video assembly ----------------
+@functools.lru_cache(maxsize=32)
+def render_footer(text, size=28):
+    # Cached: callers must not draw on the returned image
+    footer_img = Image.new("RGBA", (400,80), (0,0,0,0))
+    draw = ImageDraw.Draw(footer_img)
+    ffont = load_font(size)
+
+    # Right-align using the layout bbox (Pillow 10+ replacement for textsize)
+    bbox = draw.textbbox((0, 0), text, font=ffont)
+    tw = bbox[2] - bbox[0]
+    draw.text((400-tw-10, 10), text, font=ffont, fill=(230,230,230,200))
+    return footer_img
 
-# ---------------- clip creation ----------------
-def create_slide_clip_from_image(image_path, audio_path, idx, total):
-    audio_clip = AudioFileClip(audio_path)
-    base_dur = audio_clip.duration
-    duration = max(2.5, base_dur + PADDING_PER_SLIDE)
+def slide_duration(audio_samples):
+    # Rounded up to whole frames so the video and audio segments stay aligned
+    seconds = max(2.5, len(audio_samples) / AUDIO_FPS + PADDING_PER_SLIDE)
+    return math.ceil(seconds * VIDEO_FPS) / VIDEO_FPS
 
-    img_clip = ImageClip(image_path).set_duration(duration)
-    # Ken-Burns Zoom
+def fit_audio(audio_samples, duration):
+    n = round(duration * AUDIO_FPS)
+    if len(audio_samples) >= n:
+        return audio_samples[:n]
+    return np.concatenate([audio_samples, np.zeros((n - len(audio_samples), 2), dtype=np.float32)])
+
+def build_filter_graph(durations, footer_size):
+    w,h = RESOLUTION
+    max_x = (ZOOMED_RESOLUTION[0] - w) // 2
+    max_y = (ZOOMED_RESOLUTION[1] - h) // 2
+    graph = []
+    for i, d in enumerate(durations):
+        # Ken-Burns pan from the top-left corner towards the centre of the zoomed slide,
+        # then the page footer and a fade through black at both ends
+        p = f"min(t/{d:.4f},1)"
+        graph.append(
+            f"[{2*i}:v]crop={w}:{h}:x='{max_x}*{p}':y='{max_y}*{p}'[pan{i}];"
+            f"[pan{i}][{2*i+1}:v]overlay=x={w - footer_size[0]}:y={h - 90},"
+            f"fade=t=in:st=0:d={FADE_DURATION},fade=t=out:st={d - FADE_DURATION:.4f}:d={FADE_DURATION},"
+            f"setsar=1,format=yuv420p[v{i}]")
+    graph.append("".join(f"[v{i}]" for i in range(len(durations))) + f"concat=n={len(durations)}:v=1:a=0[v]")
+    return ";".join(graph)
+
+@functools.lru_cache(maxsize=1)
+def video_codec_args():
+    # NVENC only works when a GPU is actually present, so probe it with a tiny encode
+    probe = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-f", "lavfi",
+             "-i", "color=black:s=256x256:d=0.1", "-c:v", "h264_nvenc", "-f", "null", "-"]
     try:
-        img_clip = img_clip.resize(lambda t: 1.0 + ZOOM_FACTOR * (t / duration))
+        if subprocess.run(probe, capture_output=True, timeout=30).returncode == 0:
+            return ["-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-b:v", "4M"]
     except Exception:
         pass
-
-    # Footer (1/5, 2/5 etc)
-    footer_text = f"{idx+1}/{total}"
-    footer_img = Image.new("RGBA", (400,80), (0,0,0,0))
-    draw = ImageDraw.Draw(footer_img)
-    ffont = load_font(28)
-    
-    # Fix for footer text centering as well
-    bbox = draw.textbbox((0, 0), footer_text, font=ffont)
-    tw = bbox[2] - bbox[0]
-    draw.text((400-tw-10, 10), footer_text, font=ffont, fill=(230,230,230,200))
-    
-    footer_img_path = image_path + f".footer.{idx}.png"
-    footer_img.convert("RGB").save(footer_img_path, quality=80)
-    
-    footer_clip = ImageClip(footer_img_path).set_duration(duration).set_position(("right", RESOLUTION[1]-90))
-
-    comp = CompositeVideoClip([img_clip, footer_clip], size=RESOLUTION).set_duration(duration)
-    comp = comp.fx(lambda clip: clip.crossfadein(FADE_DURATION)).fx(lambda clip: clip.crossfadeout(FADE_DURATION))
-    
-    # Audio padding
-    if audio_clip.duration < duration:
-        silence = AudioClip(lambda t: 0*t, duration=(duration - audio_clip.duration)).set_fps(44100)
-        audio_final = concatenate_audioclips([audio_clip, silence])
-    else:
-        audio_final = audio_clip.subclip(0, duration)
-    comp = comp.set_audio(audio_final)
-    return comp
+    return ["-c:v", "libx264", "-preset", "veryfast"]
+
+async def render_video(slide_image_paths, footer_paths, durations, audio, out_path):
+    # Pan, footer overlay, fades, concatenation and encoding all run inside one ffmpeg
+    # filter graph; the mixed audio track is piped in as raw float32 PCM
+    cmd = [FFMPEG_BINARY, "-y", "-hide_banner", "-loglevel", "error", "-stats"]
+    for img_p, footer_p, d in zip(slide_image_paths, footer_paths, durations):
+        for path in (img_p, footer_p):
+            cmd += ["-loop", "1", "-framerate", str(VIDEO_FPS), "-t", f"{d:.4f}", "-i", path]
+    cmd += ["-f", "f32le", "-ar", str(AUDIO_FPS), "-ac", "2", "-i", "pipe:0"]
+    cmd += ["-filter_complex", build_filter_graph(durations, Image.open(footer_paths[0]).size),
+            "-map", "[v]", "-map", f"{2 * len(durations)}:a",
+            "-r", str(VIDEO_FPS), *video_codec_args(),
+            "-c:a", "aac", "-movflags", "+faststart", out_path]
+    proc = await asyncio.create_subprocess_exec(*cmd, stdin=asyncio.subprocess.PIPE)
+    await proc.communicate(audio.astype(np.float32).tobytes())
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
 
 # ---------------- main ----------------
 async def main():
     if not os.path.exists(OUTPUT_FOLDER):
         os.makedirs(OUTPUT_FOLDER, exist_ok=True)
     base = os.getcwd()
+    tmp_dir = tempfile.mkdtemp(prefix="videogen_", dir=temp_root())
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    bg_path = os.path.join(base, "temp_bg.jpg")
-    bg_gradient_path = os.path.join(base, "temp_bg_grad.jpg")
+    bg_path = os.path.join(tmp_dir, "temp_bg.jpg")
+    bg_gradient_path = os.path.join(tmp_dir, "temp_bg_grad.jpg")
+    # Temp files to remove at the end (the cached background is kept)
+    created_paths = [bg_path, bg_gradient_path]
 
     try:
+        # The background doesn't depend on the story, so download it while the data is fetched
+        logo_path = APP_LOGO_PATH if os.path.exists(APP_LOGO_PATH) else None
+        # run_in_executor hands it to a thread right away; the data fetch below blocks the loop
+        bg_task = asyncio.get_running_loop().run_in_executor(None, prepare_background, bg_path, bg_gradient_path, logo_path)
+
         # 1. Get Data
         data = get_trending_stock()
         if not data:
@@ -383,7 +639,7 @@ async def main():
         article_text = None
         link = data.get("article_link")
         if link:
-            article_text = fetch_article_text(link)
+            article_text = await asyncio.to_thread(fetch_article_text, link)
         if not article_text:
             article_text = data.get("script") or f"{title} - Market update."
 
@@ -392,14 +648,24 @@ async def main():
         if not slides:
             slides = [{"title": title, "body": data.get("script","")}]
 
-        # 4. Prepare Background
-        download_background(bg_path)
-        logo_path = APP_LOGO_PATH if os.path.exists(APP_LOGO_PATH) else None
-        add_dark_gradient_and_logo(bg_path, bg_gradient_path, logo_path=logo_path)
+        # 4. Prepare Background (started above, cached on disk between runs)
+        bg_gradient_path = await bg_task
+
+        # Same slides on the same cached background render the same video, so reuse it
+        video_cache_path = None
+        if os.path.dirname(bg_gradient_path) == os.path.abspath(CACHE_FOLDER):
+            video_cache_path = video_cache_path_for(slides, bg_gradient_path)
+            if os.path.exists(video_cache_path):
+                shutil.copyfile(video_cache_path, out_path)
+                os.utime(video_cache_path)
+                print(f"[SUCCESS] Video reused from cache: {out_path}")
+                return
 
         # 5. Generate Assets
         slide_image_paths = []
-        slide_audio_paths = []
+        slide_audios = []
+        image_jobs = []
+        tts_jobs = []
         
         for idx, s in enumerate(slides):
             slug_title = s.get("title")
@@ -410,17 +676,11 @@ async def main():
                 continue
 
             # A. Generate Image
-            img_path = os.path.join(base, f"slide_img_{idx}.jpg")
-            rendered_text_img = os.path.join(base, f"slide_text_{idx}.png")
-            
-            render_text_image(slug_title, body, rendered_text_img, title_font_size=86, body_font_size=44)
-
-            # Composite text over bg
-            bg = Image.open(bg_gradient_path).convert("RGB")
-            overlay = Image.open(rendered_text_img).convert("RGBA")
-            bg.paste(overlay, (0,0), overlay)
-            bg.save(img_path, quality=92)
+            # Uncompressed BMP: no JPEG encode/decode and no generation loss before x264
+            img_path = os.path.join(tmp_dir, f"slide_img_{idx}.bmp")
+            image_jobs.append((slug_title, body, bg_gradient_path, img_path))
             slide_image_paths.append(img_path)
+            created_paths.append(img_path)
 
             # B. Generate Audio
             # FIX: Concatenate title and body so the bot reads everything
@@ -428,30 +688,55 @@ async def main():
             
             if not to_read:
                 # Silence
-                silent_path = os.path.join(base, f"slide_silent_{idx}.mp3")
-                silence = AudioClip(lambda t: 0*t, duration=2.5).set_fps(44100)
-                silence.write_audiofile(silent_path, fps=44100, codec="mp3", verbose=False, logger=None)
-                slide_audio_paths.append(silent_path)
+                slide_audios.append(np.zeros((int(2.5 * AUDIO_FPS), 2), dtype=np.float32))
             else:
-                audio_path = os.path.join(base, f"slide_audio_{idx}.mp3")
-                await synthesize_slide_tts(to_read, audio_path)
-                slide_audio_paths.append(audio_path)
+                tts_jobs.append((to_read, len(slide_audios)))
+                slide_audios.append(None)
+
+        # C. Translate all slides in as few requests as possible, then synthesize concurrently
+        async def synthesize_all(texts):
+            telugu_texts = await asyncio.to_thread(translate_texts, texts)
+            limit = asyncio.Semaphore(TTS_CONCURRENCY)
+            async def limited(te):
+                async with limit:
+                    return await synthesize_slide_tts(te)
+            return await asyncio.gather(*(limited(te) for te in telugu_texts))
+
+        # Slide images are drawn in worker processes while the TTS requests are in flight
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            image_futures = [loop.run_in_executor(pool, build_slide_image, *job) for job in image_jobs]
+            results, _ = await asyncio.gather(
+                synthesize_all([text for text, _ in tts_jobs]),
+                asyncio.gather(*image_futures),
+            )
+        for (_, pos), (samples, _) in zip(tts_jobs, results):
+            slide_audios[pos] = samples
+        # A slide that fell back to silence must not be served from the cache on later runs
+        narration_ok = all(ok for _, ok in results)
 
         if not slide_image_paths:
             print("[CRITICAL] No slide images created; exiting.")
             sys.exit(1)
 
-        # 6. Stitch Video
-        clips=[]
+        # 6. Render Video
         total = len(slide_image_paths)
-        for idx, (img_p, aud_p) in enumerate(zip(slide_image_paths, slide_audio_paths)):
-            clip = create_slide_clip_from_image(img_p, aud_p, idx, total)
-            clips.append(clip)
-
-        final = concatenate_videoclips(clips, method="compose")
+        footer_paths = []
+        for idx, img_p in enumerate(slide_image_paths):
+            footer_path = img_p + f".footer.{idx}.bmp"
+            render_footer(f"{idx+1}/{total}").convert("RGB").save(footer_path)
+            footer_paths.append(footer_path)
+            created_paths.append(footer_path)
+
+        durations = [slide_duration(samples) for samples in slide_audios]
+        audio = np.concatenate([fit_audio(samples, d) for samples, d in zip(slide_audios, durations)])
         os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        final.write_videofile(out_path, fps=24, codec="libx264", audio_codec="aac", preset="medium", threads=4, ffmpeg_params=["-movflags","+faststart"])
+        await render_video(slide_image_paths, footer_paths, durations, audio, out_path)
         print(f"[SUCCESS] Video created: {out_path}")
+        if video_cache_path and narration_ok:
+            shutil.copyfile(out_path, video_cache_path + ".tmp")
+            os.replace(video_cache_path + ".tmp", video_cache_path)
+            prune_video_cache()
 
     except Exception as e:
         print(f"[FATAL] {e}")
@@ -459,10 +744,11 @@ async def main():
         sys.exit(1)
     finally:
         # Cleanup temp files
-        for fname in os.listdir(base):
-            if fname.startswith("slide_img_") or fname.startswith("slide_text_") or fname.startswith("slide_audio_") or fname.startswith("slide_silent_") or fname.startswith("temp_bg"):
-                try: os.remove(os.path.join(base, fname))
-                except: pass
+        for p in created_paths:
+            try: os.remove(p)
+            except: pass
+        try: os.rmdir(tmp_dir)
+        except: pass
 
 if __name__ == "__main__":
     asyncio.run(main())